@@ -36,4 +36,4 @@ GObject.type_register(GtkSource.View)
 from . import ui
 from . import svg
 
-__all__ = ['ui', 'svg', 'main']
+__all__ = ['ui', 'svg', 'main', 'worker', 'sweep']
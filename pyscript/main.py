@@ -27,7 +27,7 @@ import gi
 gi.require_version('Gtk', '3.0')
 gi.require_version('GtkSource', '3.0')
 
-import inkex, copy, ast, sys, traceback, re
+import inkex, copy, sys, traceback, re
 from pyscript import ui, svg
 from lxml import etree
 from inkex.deprecated import deprecate
@@ -36,6 +36,29 @@ version = "0.1"
 
 SELECTOR = re.compile(r'#(?P<ident>[a-zA-Z0-9._\-:]+)|(?P<tag>(\w+:)*\w+)')
 
+def node_states(document):
+    """
+    Snapshot of every element of document, keyed by the element itself so
+    nodes are matched by identity and not by position. Keeping the keys alive
+    also keeps lxml from handing out new proxies for the same elements.
+    """
+    return dict((node, (node.getparent(), node.tag, dict(node.attrib), node.text, node.tail))
+        for node in document.getroot().iter(etree.Element))
+
+def count_modified_nodes(before, document):
+    """Number of elements of document added, moved or changed since the before snapshot, plus removed ones."""
+    count = 0
+    seen = 0
+    for node in document.getroot().iter(etree.Element):
+        state = before.get(node)
+        if state is None:
+            count += 1
+        else:
+            seen += 1
+            if state != (node.getparent(), node.tag, dict(node.attrib), node.text, node.tail):
+                count += 1
+    return count + len(before) - seen
+
 class PYScriptExceptionInfo(object):
     def __init__(self, lineno, message):
         self.lineno = lineno
@@ -43,6 +66,9 @@ class PYScriptExceptionInfo(object):
 
 class PYScriptInfo(object):
 
+    # label -> (source, code object), shared by every document in the process.
+    code_cache = dict()
+
     def __init__(self, node):
         self.node = node
         self.id = node.attrib['id']
@@ -54,9 +80,18 @@ class PYScriptInfo(object):
             self.node.text = source
         return self.node.text
 
+    def code(self):
+        source = self.source()
+        cached = PYScriptInfo.code_cache.get(self.label)
+        if cached is not None and cached[0] == source:
+            return cached[1]
+        code = compile(source, self.label, 'exec')
+        PYScriptInfo.code_cache[self.label] = (source, code)
+        return code
+
     def compile(self):
         try:
-            ast.parse(self.source(), self.label)
+            self.code()
             return [True, self, None]
         except SyntaxError as err:
             error_class = err.__class__.__name__
@@ -67,7 +102,7 @@ class PYScriptInfo(object):
 
     def execute(self, gctx, lctx):
         try:
-            exec(self.source(), gctx, lctx)            
+            exec(self.code(), gctx, lctx)
             return [True, self, None]
         except SyntaxError as err:
             error_class = err.__class__.__name__
@@ -88,6 +123,9 @@ class PYScript(inkex.EffectExtension):
         inkex.EffectExtension.__init__(self)
         self.__edit = edit
         self.scripts = dict()
+        self.path_cache = svg.PathCache()
+        self.modified_nodes = 0
+        self.__created_scripts = 0
 
     @deprecate
     def getElementById(self, id_):
@@ -129,6 +167,7 @@ class PYScript(inkex.EffectExtension):
             'Help: https://gitlab.com/mnesarco/inkscape-pyscript',
             '"""']))
         self.scripts[script.id] = script
+        self.__created_scripts += 1
         return script
 
     def register_script(self, node):
@@ -146,12 +185,18 @@ class PYScript(inkex.EffectExtension):
     def save_state(self):
         return copy.deepcopy(self.document)
 
+    def load_document(self, document):
+        self.document = document
+        self.svg = document.getroot()
+        self.__reload()
+
     def restore_state(self, state):
         self.document = state
         self.__reload()
 
     def __reload(self):
         self.scripts = dict()
+        self.path_cache.clear()
         for node in self.get_all_script_nodes():
             self.register_script(node)
         if not ('pyscript_main' in self.scripts):
@@ -166,24 +211,36 @@ class PYScript(inkex.EffectExtension):
             ok = ok and r[0]
         return (ok, results)
 
-    def execute(self):
+    def execute(self, params=None):
         ok, results = self.compile()
         if ok: 
             saved = self.save_state()
+            before = node_states(self.document)
             smain = None
-            ctx = {'ink' : self}
+            params = dict(params or {})
+            ctx = dict(params)
+            ctx.update({'ink' : self, 'params' : params})
             sresults = []
-            for sid, script in self.scripts.items():
-                if script.is_main:
-                    smain = script
-                else:
-                    r = script.execute(ctx, ctx)
+            svg.PathCache.active = self.path_cache
+            try:
+                for sid, script in self.scripts.items():
+                    if script.is_main:
+                        smain = script
+                    else:
+                        r = script.execute(ctx, ctx)
+                        sresults.append(r)
+                        ok = ok and r[0]
+                if ok and (smain is not None):
+                    r = smain.execute(ctx, ctx)
                     sresults.append(r)
                     ok = ok and r[0]
-            if ok and (smain is not None):
-                r = smain.execute(ctx, ctx)
-                sresults.append(r)
-                ok = ok and r[0]
+            finally:
+                svg.PathCache.active = None
+            # Script nodes created since the last run are part of this run's changes.
+            self.modified_nodes = self.__created_scripts
+            self.__created_scripts = 0
+            if ok:
+                self.modified_nodes += count_modified_nodes(before, self.document)
             if not ok:
                 self.restore_state(saved)  
             return (ok, sresults)
@@ -31,13 +31,303 @@ import inkex
 from inkex.transforms import Transform
 from inkex.paths import Path
 
+def _segment_distance(p, a, b):
+    (ax, ay), (bx, by), (px, py) = a, b, p
+    dx, dy = bx - ax, by - ay
+    length2 = dx*dx + dy*dy
+    if length2 == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax)*dx + (py - ay)*dy) / length2))
+    return math.hypot(px - (ax + t*dx), py - (ay + t*dy))
+
+def _rewrite_polylines(p, fn):
+    """
+    Rebuild path arrays p replacing each run of straight segments (L, H, V)
+    by fn(points), where points includes the current point before the run.
+    fn returns the new commands for points[1:].
+    """
+    result = []
+    run = None
+    cur = start = (0.0, 0.0)
+    for c, params in p:
+        cmd = c.upper()
+        if cmd in 'LHV':
+            if cmd == 'L':
+                pt = (params[-2], params[-1])
+            elif cmd == 'H':
+                pt = (params[-1], cur[1])
+            else:
+                pt = (cur[0], params[-1])
+            if run is None:
+                run = [cur]
+            run.append(pt)
+            cur = pt
+            continue
+        if run is not None:
+            result.extend(fn(run))
+            run = None
+        result.append([c, list(params)])
+        if cmd == 'Z':
+            cur = start
+        elif cmd == 'M':
+            cur = start = (params[-2], params[-1])
+        elif len(params) > 1:
+            cur = (params[-2], params[-1])
+    if run is not None:
+        result.extend(fn(run))
+    return result
+
+def _lines(points):
+    return [['L', [x, y]] for (x, y) in points[1:]]
+
+def _douglas_peucker(points, tolerance):
+    n = len(points)
+    if n < 3:
+        return list(points)
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        a, b = points[first], points[last]
+        index, dmax = first, -1.0
+        for i in range(first + 1, last):
+            d = _segment_distance(points[i], a, b)
+            if d > dmax:
+                index, dmax = i, d
+        if dmax > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [pt for pt, k in zip(points, keep) if k]
+
+def _merge_collinear(points, tolerance):
+    # Cone intersection: every point dropped since the last kept one narrows
+    # the directions the next segment may take from it, so each of them ends
+    # up within tolerance of the segment that replaces it.
+    if len(points) < 3:
+        return list(points)
+    result = [points[0]]
+    anchor = last = 0
+    ref = None
+    i = 1
+    while i < len(points):
+        (ax, ay), (px, py) = points[anchor], points[i]
+        r = math.hypot(px - ax, py - ay)
+        if r == 0:
+            i += 1
+            continue
+        if ref is None:
+            ref = math.atan2(py - ay, px - ax)
+            low, high, reach = -math.pi, math.pi, 0.0
+        theta = (math.atan2(py - ay, px - ax) - ref + math.pi) % (2 * math.pi) - math.pi
+        if r > reach and low <= theta <= high:
+            if r > tolerance:
+                half = math.asin(tolerance / r)
+                low, high = max(low, theta - half), min(high, theta + half)
+            reach = r
+            last = i
+            i += 1
+        else:
+            result.append(points[last])
+            anchor = last
+            ref = None
+    if last != anchor:
+        result.append(points[last])
+    return result
+
+def _unit(x, y):
+    length = math.hypot(x, y)
+    if length == 0:
+        return (0.0, 0.0)
+    return (x / length, y / length)
+
+def _bezier_point(bez, t):
+    mt = 1.0 - t
+    b0, b1, b2, b3 = mt*mt*mt, 3*mt*mt*t, 3*mt*t*t, t*t*t
+    return (b0*bez[0][0] + b1*bez[1][0] + b2*bez[2][0] + b3*bez[3][0],
+            b0*bez[0][1] + b1*bez[1][1] + b2*bez[2][1] + b3*bez[3][1])
+
+def _chord_params(points):
+    u = [0.0]
+    for i in range(1, len(points)):
+        u.append(u[-1] + math.hypot(points[i][0] - points[i-1][0], points[i][1] - points[i-1][1]))
+    total = u[-1] or 1.0
+    return [x / total for x in u]
+
+def _reparameterize(bez, points, u):
+    # One Newton-Raphson step per point towards the closest point on bez.
+    result = []
+    for (px, py), t in zip(points, u):
+        mt = 1.0 - t
+        (qx, qy) = _bezier_point(bez, t)
+        d1 = [((bez[i+1][0] - bez[i][0])*3, (bez[i+1][1] - bez[i][1])*3) for i in range(3)]
+        d2 = [((d1[i+1][0] - d1[i][0])*2, (d1[i+1][1] - d1[i][1])*2) for i in range(2)]
+        q1 = (mt*mt*d1[0][0] + 2*mt*t*d1[1][0] + t*t*d1[2][0],
+              mt*mt*d1[0][1] + 2*mt*t*d1[1][1] + t*t*d1[2][1])
+        q2 = (mt*d2[0][0] + t*d2[1][0], mt*d2[0][1] + t*d2[1][1])
+        num = (qx - px)*q1[0] + (qy - py)*q1[1]
+        den = q1[0]*q1[0] + q1[1]*q1[1] + (qx - px)*q2[0] + (qy - py)*q2[1]
+        result.append(min(1.0, max(0.0, t - num / den)) if den != 0 else t)
+    return result
+
+def _generate_bezier(points, u, t1, t2):
+    p0, p3 = points[0], points[-1]
+    c00 = c01 = c11 = x0 = x1 = 0.0
+    for (px, py), t in zip(points, u):
+        mt = 1.0 - t
+        b0, b1, b2, b3 = mt*mt*mt, 3*mt*mt*t, 3*mt*t*t, t*t*t
+        a1 = (t1[0]*b1, t1[1]*b1)
+        a2 = (t2[0]*b2, t2[1]*b2)
+        c00 += a1[0]*a1[0] + a1[1]*a1[1]
+        c01 += a1[0]*a2[0] + a1[1]*a2[1]
+        c11 += a2[0]*a2[0] + a2[1]*a2[1]
+        rx = px - (p0[0]*(b0 + b1) + p3[0]*(b2 + b3))
+        ry = py - (p0[1]*(b0 + b1) + p3[1]*(b2 + b3))
+        x0 += a1[0]*rx + a1[1]*ry
+        x1 += a2[0]*rx + a2[1]*ry
+    det = c00*c11 - c01*c01
+    alpha1 = (x0*c11 - c01*x1) / det if det != 0 else 0.0
+    alpha2 = (c00*x1 - c01*x0) / det if det != 0 else 0.0
+    seg = math.hypot(p3[0] - p0[0], p3[1] - p0[1])
+    eps = 1e-6 * seg
+    if alpha1 < eps or alpha2 < eps:
+        alpha1 = alpha2 = seg / 3.0
+    return (p0, (p0[0] + t1[0]*alpha1, p0[1] + t1[1]*alpha1),
+            (p3[0] + t2[0]*alpha2, p3[1] + t2[1]*alpha2), p3)
+
+def _max_error(bez, points, u):
+    split, dmax = len(points) // 2, -1.0
+    for i in range(1, len(points) - 1):
+        (qx, qy) = _bezier_point(bez, u[i])
+        d = math.hypot(qx - points[i][0], qy - points[i][1])
+        if d > dmax:
+            split, dmax = i, d
+    return (dmax, split)
+
+def _fit_cubic(points, t1, t2, tolerance, depth=0):
+    if len(points) == 2:
+        seg = math.hypot(points[1][0] - points[0][0], points[1][1] - points[0][1]) / 3.0
+        return [(points[0], (points[0][0] + t1[0]*seg, points[0][1] + t1[1]*seg),
+            (points[1][0] + t2[0]*seg, points[1][1] + t2[1]*seg), points[1])]
+    u = _chord_params(points)
+    bez = _generate_bezier(points, u, t1, t2)
+    (err, split) = _max_error(bez, points, u)
+    if err <= tolerance or depth > 32:
+        return [bez]
+    if err <= tolerance * 4:
+        for i in range(4):
+            u = _reparameterize(bez, points, u)
+            bez = _generate_bezier(points, u, t1, t2)
+            (err, split) = _max_error(bez, points, u)
+            if err <= tolerance:
+                return [bez]
+    a, b = points[split-1], points[split+1]
+    tc = _unit(a[0] - b[0], a[1] - b[1])
+    return (_fit_cubic(points[:split+1], t1, tc, tolerance, depth + 1)
+        + _fit_cubic(points[split:], (-tc[0], -tc[1]), t2, tolerance, depth + 1))
+
+def _fit_curves(points, tolerance, corner):
+    """Fit cubic beziers on a polyline, keeping turns sharper than corner (radians)."""
+    if len(points) < 4:
+        return _lines(points)
+    pieces = [[points[0]]]
+    for i in range(1, len(points) - 1):
+        pieces[-1].append(points[i])
+        (ax, ay), (bx, by), (cx, cy) = points[i-1], points[i], points[i+1]
+        turn = abs(math.atan2((bx - ax)*(cy - by) - (by - ay)*(cx - bx),
+            (bx - ax)*(cx - bx) + (by - ay)*(cy - by)))
+        if turn > corner:
+            pieces.append([points[i]])
+    pieces[-1].append(points[-1])
+    result = []
+    for piece in pieces:
+        if len(piece) < 4:
+            result.extend(_lines(piece))
+            continue
+        t1 = _unit(piece[1][0] - piece[0][0], piece[1][1] - piece[0][1])
+        t2 = _unit(piece[-2][0] - piece[-1][0], piece[-2][1] - piece[-1][1])
+        for bez in _fit_cubic(piece, t1, t2, tolerance):
+            result.append(['C', [bez[1][0], bez[1][1], bez[2][0], bez[2][1], bez[3][0], bez[3][1]]])
+    return result
+
+class PathCache(object):
+    """
+    Bounded LRU cache of parsed path arrays and styles, keyed by node id
+    and the hashes of its d and style attributes, so a node is parsed again
+    only when those attributes change. Cached data is immutable; PathObject
+    copies it on first write.
+
+    While a document is executed, PYScript makes its cache the active one and
+    PathObject(node=...) uses it unless another cache is given.
+    """
+
+    active = None
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _parse(self, d, style):
+        p = tuple((c, tuple(params)) for c, params in Path(d).to_arrays())
+        return (p, tuple(inkex.Style.parse_str(style)))
+
+    def lookup(self, node):
+        d = node.attrib['d']
+        style = node.attrib['style']
+        nid = node.get('id')
+        if nid is None:
+            return self._parse(d, style)
+        key = (nid, hash(d), hash(style))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == d and entry[1] == style:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        parsed = self._parse(d, style)
+        self._entries[key] = (d, style, parsed)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return parsed
+
 class PathObject(object):
     
-    def __init__(self, p=[], node=None, style={}, attrib={}):    
+    def __init__(self, p=[], node=None, style={}, attrib={}, cache=None):    
         self._p = p
+        self._shared = False
         self._style = style
         self._attrib = attrib
-        self._parseNode(node)
+        self._mark_dirty()
+        self._parseNode(node, cache)
+
+    def _mark_dirty(self):
+        # Nothing is known about the target node: every part must be written.
+        self._dirty_path = True
+        self._dirty_attrib = None
+        self._clean_style = None
+
+    def _mark_clean(self):
+        self._dirty_path = False
+        self._dirty_attrib = set()
+        self._clean_style = dict(self._style)
+
+    def _edit(self):
+        # Path arrays coming from a PathCache are shared read-only tuples,
+        # take a private copy before the first modification.
+        if self._shared:
+            self._p = [[c, list(params)] for c, params in self._p]
+            self._shared = False
+        self._dirty_path = True
+        return self._p
 
     def _abs_point(self, dx, dy):
         (x, y, c) = self.end_point()
@@ -45,13 +335,25 @@ class PathObject(object):
 
     def parse(self, d):
         self._p = Path(d).to_arrays()
+        self._shared = False
+        self._dirty_path = True
 
-    def _parseNode(self, node):
+    def _parseNode(self, node, cache=None):
         if node is not None:
-            self._p = Path(node.attrib['d']).to_arrays()
-            self._style = dict(inkex.Style.parse_str(node.attrib['style']))
+            if cache is None:
+                cache = PathCache.active
+            if cache is None:
+                self._p = Path(node.attrib['d']).to_arrays()
+                self._style = dict(inkex.Style.parse_str(node.attrib['style']))
+                self._shared = False
+            else:
+                (p, style) = cache.lookup(node)
+                self._p = p
+                self._style = dict(style)
+                self._shared = True
             self._attrib = copy.copy(node.attrib)
             self._node = node
+            self._mark_clean()
         else:
             self._node = None
 
@@ -63,25 +365,54 @@ class PathObject(object):
             attrs['id'] = elem_id
             attrs['d'] = str(Path(self._p))
             self._node = etree.SubElement(parent, 'path', attrs)
+            self._mark_clean()
         else:
             self.commit(node)
-            
+
     def commit(self, node = None):
+        """
+        Write pending changes into node (default: the node this path was read
+        from). Parts unchanged since that node was read are not serialized, and
+        values already present in the target node are not rewritten.
+        """
         if node is None:
             node = self._node
         if node is None:
             raise ValueError('No svg:path node has been selected.')
-        if len(self._attrib) > 0:
-            node.attrib.update(self._attrib)
+        full = node is not self._node
+        changes = dict()
+        if full or self._dirty_attrib is None:
+            names = self._attrib.keys()
+        else:
+            names = self._dirty_attrib
+        for name in names:
+            value = self._attrib[name]
+            if node.get(name) != value:
+                changes[name] = value
         if len(self._style) > 0:
-            node.attrib['style'] = str(inkex.Style(self._style))
+            if full or self._style != self._clean_style:
+                changes['style'] = str(inkex.Style(self._style))
+            else:
+                changes.pop('style', None)
         if self._p is not None:
-            node.attrib['d'] = str(Path(self._p))
+            if full or self._dirty_path:
+                changes['d'] = str(Path(self._p))
+            else:
+                changes.pop('d', None)
+        for name in ('style', 'd'):
+            if name in changes and node.get(name) == changes[name]:
+                del changes[name]
+        if changes:
+            node.attrib.update(changes)
+        if not full:
+            self._mark_clean()
 
     def attrib(self, name, value = None):
         if value is not None:
             self._attrib[name] = str(value)
-        return self.attrib[name]
+            if self._dirty_attrib is not None:
+                self._dirty_attrib.add(name)
+        return self._attrib[name]
 
     def style(self, style = None):
         if isinstance(style, collections.Mapping):
@@ -93,15 +424,15 @@ class PathObject(object):
         self.rotate_abs(a, x+cx, y+cy)
             
     def rotate_abs(self, a, cx=0, cy=0):
-        self._p[:] = Path(self._p).rotate(math.degrees(a), (cx, cy)).to_arrays()
+        self._edit()[:] = Path(self._p).rotate(math.degrees(a), (cx, cy)).to_arrays()
             
     def scale(self, fx, fy=None):
         if fy is None:
             fy = fx
-        self._p[:] = Path(self._p).scale(fx, fy).to_arrays()
+        self._edit()[:] = Path(self._p).scale(fx, fy).to_arrays()
 
     def translate(self, dx, dy):
-        self._p[:] = Path(self._p).translate(dx, dy).to_arrays()
+        self._edit()[:] = Path(self._p).translate(dx, dy).to_arrays()
 
     def start_point(self):
         c, params = self._p[0]
@@ -123,7 +454,7 @@ class PathObject(object):
 
     def translate_to(self, x, y):
         (sx, sy, c) = self.start_point()
-        self._p[:] = Path(self._p).translate(x - sx, y - sy).to_arrays()
+        self._edit()[:] = Path(self._p).translate(x - sx, y - sy).to_arrays()
 
     def move(self, dx, dy, mode='M'):
         if len(self._p) > 0:
@@ -131,12 +462,16 @@ class PathObject(object):
             self.move_to(x+dx, y+dy, mode)
         else:
             self._p = [['M', [dx, dy]]]
+            self._shared = False
+            self._dirty_path = True
 
     def move_to(self, x, y, mode='M'):
         if len(self._p) > 0:
-            self._p.append([mode.upper(), [x, y]])
+            self._edit().append([mode.upper(), [x, y]])
         else:
             self._p = [['M', [x, y]]]
+            self._shared = False
+            self._dirty_path = True
 
     def line(self, dx, dy):
         self.move(dx, dy, 'L')
@@ -163,7 +498,7 @@ class PathObject(object):
         self.arc_to(rx, ry, a, l, s, x, y)
 
     def arc_to(self, rx, ry, a, l, s, x, y):
-        self._p.append(['A', [rx, ry, a, l, s, x, y]])
+        self._edit().append(['A', [rx, ry, a, l, s, x, y]])
 
     def c_bezier(self, dx0, dy0, dx1, dy1, dx, dy):
         (x0, y0) = self._abs_point(dx0, dy0)
@@ -172,7 +507,7 @@ class PathObject(object):
         self.c_bezier_to(x0, y0, x1, y1, x, y)
 
     def c_bezier_to(self, x0, y0, x1, y1, x, y):
-        self._p.append(['C', [x0, y0, x1, y1, x, y]])
+        self._edit().append(['C', [x0, y0, x1, y1, x, y]])
 
     def q_bezier(self, dx0, dy0, dx, dy):
         (x0, y0) = self._abs_point(dx0, dy0)
@@ -180,7 +515,7 @@ class PathObject(object):
         self.q_bezier_to(x0, y0, x, y)
 
     def q_bezier_to(self, x0, y0, x, y):
-        self._p.append(['Q', [x0, y0, x, y]])
+        self._edit().append(['Q', [x0, y0, x, y]])
 
     def t_bezier_to(self, x, y):
         c, params = self._p[-1]
@@ -231,6 +566,31 @@ class PathObject(object):
         self.arc(r, r, 1, 0, 1, -r, +r)
         self.arc(r, r, 1, 0, 1, -r, -r)
 
+    def node_count(self):
+        return sum(1 for c, params in self._p if c.upper() != 'Z')
+
+    def _absolute(self):
+        if any(c.islower() and c != 'z' for c, params in self._p):
+            self._edit()[:] = Path(self._p).to_absolute().to_arrays()
+
+    def _map_polylines(self, fn):
+        self._absolute()
+        before = self.node_count()
+        self._edit()[:] = _rewrite_polylines(self._p, fn)
+        return (before, self.node_count())
+
+    def simplify(self, tolerance):
+        """Ramer-Douglas-Peucker decimation of straight segments. Returns (before, after) node counts."""
+        return self._map_polylines(lambda points: _lines(_douglas_peucker(points, tolerance)))
+
+    def merge_collinear(self, tolerance=1e-9):
+        """Merge consecutive straight segments whose inner points lie within tolerance of the merged segment. Returns (before, after) node counts."""
+        return self._map_polylines(lambda points: _lines(_merge_collinear(points, tolerance)))
+
+    def fit_curves(self, tolerance, corner=math.radians(60)):
+        """Replace dense polylines with cubic beziers. Returns (before, after) node counts."""
+        return self._map_polylines(lambda points: _fit_curves(points, tolerance, corner))
+
     def close(self):
-        self._p.append(['z', []])
+        self._edit().append(['z', []])
 
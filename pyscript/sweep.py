@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+sweep.py
+pyscript parameter sweep: one output document per row of parameters.
+
+Copyright (C) 2019 Frank Martinez <mnesarco at gmail.com>
+
+This file is part of inkscape-pyscript.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+
+import os, re, csv, json, copy, traceback, multiprocessing
+import inkex
+from pyscript import main
+
+DEFAULT_PATTERN = '{stem}-{index:03d}.svg'
+
+# Only plain decimal numbers are converted, so codes like 007, inf or 1e3 stay text.
+INT = re.compile(r'[-+]?(0|[1-9][0-9]*)$')
+FLOAT = re.compile(r'[-+]?(0|[1-9][0-9]*)?\.[0-9]+$')
+
+def _value(text):
+    if INT.match(text):
+        return int(text)
+    if FLOAT.match(text):
+        return float(text)
+    return text
+
+def read_table(path):
+    """
+    Read parameter sets from a CSV file (one row per set) or a JSON list of objects.
+    CSV values that are plain decimal numbers (10, -2, 0.5) become int or float,
+    anything else is kept as text.
+    """
+    if path.lower().endswith('.json'):
+        with open(path) as f:
+            rows = json.load(f)
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise ValueError('%s must contain a list of objects.' % path)
+        return rows
+    rows = []
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if None in row or None in row.values():
+                raise ValueError('%s:%d: expected %d fields' % (path, reader.line_num, len(reader.fieldnames)))
+            rows.append(dict((k, _value(v)) for k, v in row.items()))
+    return rows
+
+class SweepResult(object):
+    def __init__(self, index, ok, path, messages, modified_nodes = 0):
+        self.index = index
+        self.ok = ok
+        self.path = path
+        self.messages = messages
+        self.modified_nodes = modified_nodes
+
+# Sweep being run by this process. Forked pool workers inherit it, together
+# with the parsed master document and the compiled scripts.
+_current = None
+
+def _run_row(index):
+    return _current.run_row(index)
+
+class Sweep(object):
+    """
+    Runs the scripts of a master document once per parameter set. Row values
+    are available to the scripts as globals and through the params dict.
+    """
+
+    def __init__(self, master_path, rows, output_dir, pattern = DEFAULT_PATTERN):
+        self.rows = rows
+        self.output_dir = output_dir
+        self.pattern = pattern
+        self.stem = os.path.splitext(os.path.basename(master_path))[0]
+        self.paths = self.__output_paths()
+        self.master = inkex.load_svg(master_path)
+        self.__compile()
+
+    def __compile(self):
+        ext = main.PYScript(edit=False)
+        ext.load_document(self.master)
+        (ok, results) = ext.compile()
+        if not ok:
+            raise ValueError("\n".join(err.message for (ok, script, err) in results if not ok))
+
+    def __output_paths(self):
+        paths = []
+        seen = dict()
+        for index, row in enumerate(self.rows):
+            try:
+                name = self.pattern.format(stem=self.stem, index=index + 1, **row)
+            except (KeyError, IndexError, TypeError, ValueError) as err:
+                # Unknown fields, or columns clashing with stem/index.
+                raise ValueError('Row %d: cannot build a file name from pattern %r: %s %s'
+                    % (index + 1, self.pattern, err.__class__.__name__, err))
+            path = os.path.join(self.output_dir, name)
+            key = os.path.normcase(os.path.normpath(path))
+            if key in seen:
+                raise ValueError('Rows %d and %d would both write %s' % (seen[key] + 1, index + 1, path))
+            seen[key] = index
+            paths.append(path)
+        return paths
+
+    def output_path(self, index):
+        return self.paths[index]
+
+    def run_row(self, index):
+        try:
+            ext = main.PYScript(edit=False)
+            ext.load_document(copy.deepcopy(self.master))
+            (ok, results) = ext.execute(self.rows[index])
+            if not ok:
+                messages = [err.message for (ok_, script, err) in results if not ok_]
+                return SweepResult(index, False, None, messages)
+            path = self.output_path(index)
+            ext.document.write(path)
+            return SweepResult(index, True, path, [], ext.modified_nodes)
+        except SystemExit as err:
+            # A script calling sys.exit() only fails its own row.
+            return SweepResult(index, False, None, ['Script exited with status %s' % err.code])
+        except Exception:
+            return SweepResult(index, False, None, [traceback.format_exc()])
+
+    def run(self, jobs = None):
+        global _current
+        os.makedirs(self.output_dir, exist_ok=True)
+        _current = self
+        try:
+            if jobs == 1 or len(self.rows) < 2 or 'fork' not in multiprocessing.get_all_start_methods():
+                return [self.run_row(i) for i in range(len(self.rows))]
+            ctx = multiprocessing.get_context('fork')
+            with ctx.Pool(jobs) as pool:
+                results = list(pool.imap_unordered(_run_row, range(len(self.rows))))
+            return sorted(results, key=lambda r: r.index)
+        finally:
+            _current = None
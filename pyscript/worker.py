@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+worker.py
+pyscript resident worker.
+
+Copyright (C) 2019 Frank Martinez <mnesarco at gmail.com>
+
+This file is part of inkscape-pyscript.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+
+import os, sys, io, stat, socket, signal, locale, traceback
+import pyscript_client
+from pyscript import main
+
+class Worker(object):
+    """
+    Keeps inkex, lxml, gi and pyscript imported and serves pyscript_run
+    requests over a local Unix socket. Every request is handled in a forked
+    child, so each run starts from the same warm, pristine interpreter and
+    nothing a script defines or mutates (globals, modules, mutable defaults)
+    leaks into the next one.
+    """
+
+    def __init__(self, path = None):
+        self.path = path or pyscript_client.socket_path()
+
+    def serve(self):
+        self.__prepare_dir()
+        self.__claim_path()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            umask = os.umask(0o177)
+            try:
+                server.bind(self.path)
+            finally:
+                os.umask(umask)
+            os.chmod(self.path, 0o600)
+            server.listen(8)
+            signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+            while True:
+                conn, addr = server.accept()
+                if os.fork() == 0:
+                    server.close()
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    try:
+                        self.handle(conn)
+                    finally:
+                        os._exit(0)
+                conn.close()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def __prepare_dir(self):
+        # The default location must be a private directory of the current user.
+        if self.path != pyscript_client.socket_path() or 'PYSCRIPT_WORKER_SOCKET' in os.environ:
+            return
+        directory = os.path.dirname(self.path)
+        if not os.path.lexists(directory):
+            os.mkdir(directory, 0o700)
+        st = os.lstat(directory)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise RuntimeError('%s must be a directory owned by the current user with mode 0700' % directory)
+
+    def __claim_path(self):
+        if os.path.lexists(self.path):
+            if not pyscript_client.owned(self.path):
+                raise RuntimeError('%s belongs to another user' % self.path)
+            sock = pyscript_client.connect(self.path)
+            if sock is not None:
+                sock.close()
+                raise RuntimeError('A pyscript worker is already listening on %s' % self.path)
+            os.unlink(self.path)
+
+    def handle(self, conn):
+        try:
+            request = pyscript_client.recv_json(conn)
+            (status, errors, output) = self.run(request['args'], request['cwd'], request.get('env'))
+            pyscript_client.send_json(conn, {'status': status, 'stderr': errors})
+            pyscript_client.send_frame(conn, output)
+        finally:
+            conn.close()
+
+    def run(self, args, cwd, env = None):
+        output = io.BytesIO()
+        errors = io.StringIO()
+        status = 0
+        # Run with the environment Inkscape gave pyscript_run.py, not the worker's.
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(env)
+            try:
+                locale.setlocale(locale.LC_ALL, '')
+            except locale.Error:
+                pass
+        os.chdir(cwd)
+        sys.stdin = open(os.devnull)
+        sys.stderr = errors
+        try:
+            main.PYScript(edit=False).run(args, output=output)
+        except SystemExit as err:
+            if err.code is None or isinstance(err.code, int):
+                status = err.code or 0
+            else:
+                errors.write("%s\n" % err.code)
+                status = 1
+        except Exception:
+            traceback.print_exc()
+            status = 1
+        finally:
+            sys.stderr = sys.__stderr__
+        return (status, errors.getvalue(), output.getvalue())
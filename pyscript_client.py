@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+pyscript_client.py
+pyscript worker protocol and thin client.
+
+Copyright (C) 2019 Frank Martinez <mnesarco at gmail.com>
+
+This file is part of inkscape-pyscript.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+
+# This module must only depend on the standard library: it is imported by
+# pyscript_run.py before (and instead of) inkex, lxml and gi.
+
+import os, sys, socket, struct, json, tempfile
+
+HEADER = struct.Struct('>I')
+
+def socket_dir():
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return runtime
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return os.path.join(tempfile.gettempdir(), 'pyscript-%d' % uid)
+
+def socket_path():
+    path = os.environ.get('PYSCRIPT_WORKER_SOCKET')
+    if path:
+        return path
+    return os.path.join(socket_dir(), 'pyscript-worker.sock')
+
+def owned(path):
+    # Only talk to sockets created by the current user, anybody else could
+    # have bound the path to intercept documents.
+    try:
+        return os.lstat(path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+def send_frame(sock, data):
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+def recv_exact(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError('pyscript worker closed the connection.')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def recv_frame(sock):
+    (size,) = HEADER.unpack(recv_exact(sock, HEADER.size))
+    return recv_exact(sock, size)
+
+def send_json(sock, obj):
+    send_frame(sock, json.dumps(obj).encode('utf-8'))
+
+def recv_json(sock):
+    return json.loads(recv_frame(sock).decode('utf-8'))
+
+def connect(path = None):
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    path = path or socket_path()
+    if not owned(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def run_remote(args, stdout = None, stderr = None):
+    """
+    Run pyscript_run with args on the resident worker.
+    Returns the exit status, or None if no worker is listening.
+    """
+    if stdout is None:
+        stdout = sys.stdout.buffer
+    if stderr is None:
+        stderr = sys.stderr
+    sock = connect()
+    if sock is None:
+        return None
+    try:
+        send_json(sock, {'args': list(args), 'cwd': os.getcwd(), 'env': dict(os.environ)})
+        reply = recv_json(sock)
+        output = recv_frame(sock)
+    except OSError:
+        # The worker went away before answering, nothing has been written yet.
+        return None
+    finally:
+        sock.close()
+    stdout.write(output)
+    stdout.flush()
+    if reply.get('stderr'):
+        stderr.write(reply['stderr'])
+        stderr.flush()
+    return reply.get('status', 0)
@@ -21,7 +21,13 @@ You should have received a copy of the GNU General Public License
 along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 """
-from pyscript import main
+import sys
+import pyscript_client
 
 if __name__ == '__main__':
-    main.PYScript(edit=False).run()
+    status = pyscript_client.run_remote(sys.argv[1:])
+    if status is None:
+        from pyscript import main
+        main.PYScript(edit=False).run()
+    else:
+        sys.exit(status)
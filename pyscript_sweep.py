@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+pyscript_sweep.py
+pyscript parameter sweep command line.
+
+Copyright (C) 2019 Frank Martinez <mnesarco at gmail.com>
+
+This file is part of inkscape-pyscript.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+import sys, argparse
+from pyscript import sweep
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError('must be at least 1')
+    return value
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate one document per row of parameters.')
+    parser.add_argument('master', help='master svg document with python scripts')
+    parser.add_argument('table', help='parameter sets, csv or json')
+    parser.add_argument('-o', '--output', default='.', help='output directory')
+    parser.add_argument('-p', '--pattern', default=sweep.DEFAULT_PATTERN,
+        help='output file name, may use {stem}, {index} and any parameter')
+    parser.add_argument('-j', '--jobs', type=positive_int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+    try:
+        s = sweep.Sweep(args.master, sweep.read_table(args.table), args.output, args.pattern)
+    except ValueError as err:
+        sys.stderr.write("%s\n" % err)
+        sys.exit(2)
+    failed = 0
+    for r in s.run(args.jobs):
+        if r.ok:
+            print("row %d: %s (%d nodes modified)" % (r.index + 1, r.path, r.modified_nodes))
+        else:
+            failed += 1
+            sys.stderr.write("row %d failed:\n%s\n" % (r.index + 1, "\n".join(r.messages)))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+pyscript_worker.py
+pyscript resident worker launcher.
+
+Copyright (C) 2019 Frank Martinez <mnesarco at gmail.com>
+
+This file is part of inkscape-pyscript.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+from pyscript import worker
+
+if __name__ == '__main__':
+    worker.Worker().serve()